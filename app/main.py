@@ -1,7 +1,8 @@
-import os, glob, json, time
+import os, glob, json, math, time
 from typing import Dict, Any, List
 from pathlib import Path
 
+from anyio.to_thread import current_default_thread_limiter
 from fastapi import FastAPI, Body, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -14,6 +15,7 @@ from .retriever import index_memory, search
 from .rules_fallback import fallback_options
 from .model_infer import generate_options
 from .summarizer import make_summary
+from .scheduler import RequestScheduler, PRIORITIES
 
 # ---------------- App & CORS ----------------
 app = FastAPI(title="Clinical Copilot (Unified)", version="0.1")
@@ -54,6 +56,35 @@ def _startup_index():
         index_memory(chunks)
         print(f"[unified] Indexed {len(chunks)} chunks from {KNOW_DIR}")
 
+# ------------- Admission control -------------
+# Caps concurrent model calls; interactive queries drain before background ones.
+# /reason is a sync handler, so every queued or in-flight request holds a
+# threadpool thread: queue caps + max_inflight must stay below the pool size
+# (anyio default: 40) or shed requests could not get a thread to answer.
+SCHEDULER = RequestScheduler(
+    max_inflight=int(os.getenv("REASON_MAX_INFLIGHT", "4")),
+    max_queue={
+        "interactive": int(os.getenv("REASON_QUEUE_INTERACTIVE", "20")),
+        "background": int(os.getenv("REASON_QUEUE_BACKGROUND", "8")),
+    },
+)
+# Budget (seconds) for queueing + the model call before a request is shed to
+# the rules engine; also the upper bound for a client-supplied deadline_ms
+REASON_DEADLINES = {
+    "interactive": float(os.getenv("REASON_DEADLINE_INTERACTIVE", "5")),
+    "background": float(os.getenv("REASON_DEADLINE_BACKGROUND", "30")),
+}
+
+@app.on_event("startup")
+async def _check_threadpool():
+    limit = current_default_thread_limiter().total_tokens
+    held = SCHEDULER.max_inflight + sum(SCHEDULER.max_queue.values())
+    if held >= limit:
+        raise RuntimeError(
+            f"/reason may hold {held} threads (REASON_MAX_INFLIGHT + REASON_QUEUE_*) "
+            f"but the threadpool has only {limit}; lower the limits"
+        )
+
 # ---------------- Data models ----------------
 class IngestPayload(BaseModel):
     patient_id: str
@@ -64,6 +95,11 @@ class IngestPayload(BaseModel):
 def status():
     return {"ok": True, "ts": time.time()}
 
+@app.get("/status/scheduler")
+def scheduler_status():
+    """Queue depth, wait times and shed counts for /reason."""
+    return SCHEDULER.stats()
+
 # -------- FHIR ingestion demo --------
 FHIR_DB: Dict[str, Dict[str, Any]] = {}
 DB_FILE = Path("fhir_db.json")
@@ -156,24 +192,49 @@ def reason_info():
 @app.post("/reason")
 def reason_api(p: dict = Body(...)):
     """
-    Input: {"question": "...", "patient_facts":[{"text":"..."}]}
+    Input: {"question": "...", "patient_facts":[{"text":"..."}],
+            "priority": "interactive"|"background", "deadline_ms": int}
     Returns: options + evidence + engine + backend-made summary.
+    deadline_ms bounds queueing plus the model call (capped at the
+    REASON_DEADLINE_* budget). Requests that can no longer make it are shed
+    and answered by the rules engine.
     """
     facts = p.get("patient_facts", [])
     q = p["question"]
+    priority = p.get("priority", "interactive")
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=422, detail=f"priority must be one of {list(PRIORITIES)}")
+    timeout = REASON_DEADLINES[priority]
+    deadline_ms = p.get("deadline_ms")
+    if deadline_ms is not None:
+        if isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float)):
+            raise HTTPException(status_code=422, detail="deadline_ms must be a number")
+        try:
+            deadline_ms = float(deadline_ms)
+        except OverflowError:
+            raise HTTPException(status_code=422, detail="deadline_ms is too large")
+        if not math.isfinite(deadline_ms) or deadline_ms < 0:
+            raise HTTPException(status_code=422, detail="deadline_ms must be a finite non-negative number")
+        timeout = min(deadline_ms / 1000.0, timeout)
 
     # retrieve guideline chunks
     hits = search(q, k=6)
 
     engine = "model"
-    try:
-        out = generate_options(q, facts, hits)
-        if not out.get("options"):
-            raise RuntimeError("empty options")
-    except Exception as e:
-        print(f"[warn] tiny-model fallback: {e}")
-        out = fallback_options(q, facts, hits)
-        engine = "rules"
+    with SCHEDULER.slot(priority, timeout) as admitted:
+        if admitted:
+            try:
+                out = generate_options(q, facts, hits)
+                if not out.get("options"):
+                    raise RuntimeError("empty options")
+            except Exception as e:
+                print(f"[warn] tiny-model fallback: {e}")
+                out = fallback_options(q, facts, hits)
+                engine = "rules"
+        else:
+            print(f"[warn] load shed ({priority}): answering from rules engine")
+            out = fallback_options(q, facts, hits)
+            engine = "rules"
 
     options = out.get("options", [])[:3]
     summary = make_summary(q, facts, options)
@@ -181,6 +242,7 @@ def reason_api(p: dict = Body(...)):
     return {
         "question": q,
         "engine": engine,
+        "shed": not admitted,
         "options": options,
         "summary": summary,
         "evidence": {"docs": hits, "patient_snippets": facts}
@@ -0,0 +1,194 @@
+# app/scheduler.py
+import threading, time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+PRIORITIES = ("interactive", "background")
+
+
+class _Ticket:
+    __slots__ = ("priority", "enqueued", "deadline")
+
+    def __init__(self, priority: str, deadline: float):
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.deadline = deadline
+
+
+class RequestScheduler:
+    """
+    Admission control in front of the model call.
+
+    - One bounded FIFO queue per priority; interactive always drains first.
+    - At most `max_inflight` model calls run at once.
+    - A request is shed (returns None from `admit`) when it would have to
+      wait and its queue is full, when the estimated wait plus one model call
+      already exceeds its deadline, or as soon as the time left can no longer
+      fit a model call while it is still queued.
+    """
+
+    def __init__(self, max_inflight: int = 4, max_queue: Optional[Dict[str, int]] = None):
+        self.max_inflight = max(1, max_inflight)
+        self.max_queue = {p: 32 for p in PRIORITIES}
+        self.max_queue.update(max_queue or {})
+        self._cond = threading.Condition()
+        self._queues: Dict[str, deque] = {p: deque() for p in PRIORITIES}
+        self._inflight = 0
+        # exponentially weighted average of model-call duration (seconds)
+        self._avg_service = 0.0
+        self._counters = {p: {"admitted": 0, "wait_total": 0.0, "wait_max": 0.0,
+                              "shed": 0, "shed_wait_total": 0.0, "shed_wait_max": 0.0}
+                          for p in PRIORITIES}
+
+    # ---------------- internals ----------------
+    def _ahead_of(self, ticket: _Ticket) -> int:
+        """Requests that will be served before `ticket` (queued ahead + in flight)."""
+        ahead = self._inflight
+        for p in PRIORITIES:
+            q = self._queues[p]
+            if p == ticket.priority:
+                for t in q:
+                    if t is ticket:
+                        break
+                    ahead += 1
+                break
+            ahead += len(q)
+        return ahead
+
+    def _estimated_wait(self, ahead: int) -> float:
+        if ahead < self.max_inflight:
+            return 0.0
+        rounds = (ahead - self.max_inflight) // self.max_inflight + 1
+        return rounds * self._avg_service
+
+    def _is_next(self, ticket: _Ticket) -> bool:
+        for p in PRIORITIES:
+            if self._queues[p]:
+                return self._queues[p][0] is ticket
+        return False
+
+    def _shed(self, priority: str, waited: float = 0.0) -> None:
+        c = self._counters[priority]
+        c["shed"] += 1
+        c["shed_wait_total"] += waited
+        c["shed_wait_max"] = max(c["shed_wait_max"], waited)
+
+    def _queued_ahead(self, priority: str) -> bool:
+        """Anything of equal or higher priority already waiting?"""
+        for p in PRIORITIES:
+            if self._queues[p]:
+                return True
+            if p == priority:
+                return False
+        return False
+
+    def _admitted(self, ticket: _Ticket) -> float:
+        self._inflight += 1
+        waited = time.monotonic() - ticket.enqueued
+        c = self._counters[ticket.priority]
+        c["admitted"] += 1
+        c["wait_total"] += waited
+        c["wait_max"] = max(c["wait_max"], waited)
+        return waited
+
+    # ---------------- public API ----------------
+    def admit(self, priority: str, timeout: float) -> Optional[float]:
+        """
+        Block until a model slot is free or the request is shed.
+        `timeout` covers queueing plus the model call itself, whose duration
+        is estimated from recent calls. A request that finds a free slot with
+        nothing queued ahead is always admitted, which also keeps that
+        estimate fresh.
+        Returns the time spent queued (seconds) on admission, else None.
+        Every admitted request must be paired with `release`.
+        """
+        if priority not in self._queues:
+            raise ValueError(f"unknown priority {priority!r}; expected one of {PRIORITIES}")
+        ticket = _Ticket(priority, time.monotonic() + max(0.0, timeout))
+
+        with self._cond:
+            if self._inflight < self.max_inflight and not self._queued_ahead(priority):
+                return self._admitted(ticket)
+
+            q = self._queues[priority]
+            if len(q) >= self.max_queue[priority]:
+                self._shed(priority)
+                return None
+            q.append(ticket)
+            try:
+                if self._estimated_wait(self._ahead_of(ticket)) + self._avg_service > timeout:
+                    q.remove(ticket)
+                    self._shed(priority)
+                    self._cond.notify_all()
+                    return None
+
+                while not (self._inflight < self.max_inflight and self._is_next(ticket)):
+                    # give up while there is still time for a rules-engine answer
+                    remaining = ticket.deadline - self._avg_service - time.monotonic()
+                    if remaining <= 0:
+                        q.remove(ticket)
+                        self._shed(priority, time.monotonic() - ticket.enqueued)
+                        self._cond.notify_all()
+                        return None
+                    self._cond.wait(min(remaining, threading.TIMEOUT_MAX))
+            except BaseException:
+                # never leave a dead ticket at the head of the queue
+                if ticket in q:
+                    q.remove(ticket)
+                self._cond.notify_all()
+                raise
+
+            q.popleft()
+            waited = self._admitted(ticket)
+            # the next ticket in line may now be eligible too
+            self._cond.notify_all()
+            return waited
+
+    def release(self, service_time: float) -> None:
+        with self._cond:
+            self._inflight -= 1
+            if self._avg_service == 0.0:
+                self._avg_service = service_time
+            else:
+                self._avg_service = 0.8 * self._avg_service + 0.2 * service_time
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: str, timeout: float) -> Iterator[bool]:
+        """`with scheduler.slot(p, t) as admitted:` -- admitted is False if shed."""
+        waited = self.admit(priority, timeout)
+        if waited is None:
+            yield False
+            return
+        start = time.monotonic()
+        try:
+            yield True
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            queues = {}
+            for p in PRIORITIES:
+                q = self._queues[p]
+                c = self._counters[p]
+                queues[p] = {
+                    "depth": len(q),
+                    "capacity": self.max_queue[p],
+                    "oldest_wait_s": round(now - q[0].enqueued, 3) if q else 0.0,
+                    "admitted": c["admitted"],
+                    "shed": c["shed"],
+                    "avg_wait_s": round(c["wait_total"] / c["admitted"], 3) if c["admitted"] else 0.0,
+                    "max_wait_s": round(c["wait_max"], 3),
+                    # time shed requests spent queued before giving up
+                    "shed_avg_wait_s": round(c["shed_wait_total"] / c["shed"], 3) if c["shed"] else 0.0,
+                    "shed_max_wait_s": round(c["shed_wait_max"], 3),
+                }
+            return {
+                "inflight": self._inflight,
+                "max_inflight": self.max_inflight,
+                "avg_service_s": round(self._avg_service, 3),
+                "queues": queues,
+            }
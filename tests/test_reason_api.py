@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.scheduler import RequestScheduler
+
+MODEL_OPTION = {"title": "Model option", "rationale": "", "steps": [], "risks": [],
+                "contraindications": [], "monitoring": [], "citations": []}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "search", lambda q, k=6: [])
+    monkeypatch.setattr(main, "generate_options", lambda q, facts, hits: {"options": [MODEL_OPTION]})
+    monkeypatch.setattr(main, "SCHEDULER", RequestScheduler(max_inflight=1))
+    return TestClient(main.app)
+
+
+def _ask(client, **extra):
+    return client.post("/reason", json={"question": "fever and cough", **extra})
+
+
+def test_model_answer(client):
+    r = _ask(client)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["engine"] == "model" and body["shed"] is False
+    assert body["options"][0]["title"] == "Model option"
+
+
+def test_unknown_priority_rejected(client):
+    assert _ask(client, priority="urgent").status_code == 422
+
+
+@pytest.mark.parametrize("deadline_ms", [True, "1000", [1000], -1, "NaN", 10 ** 400])
+def test_bad_deadline_rejected(client, deadline_ms):
+    if deadline_ms == "NaN":
+        r = client.post("/reason", content='{"question": "q", "deadline_ms": NaN}',
+                        headers={"content-type": "application/json"})
+    else:
+        r = _ask(client, deadline_ms=deadline_ms)
+    assert r.status_code == 422
+
+
+@pytest.mark.parametrize("priority,deadline_ms,expected", [
+    ("interactive", None, main.REASON_DEADLINES["interactive"]),
+    ("interactive", 250, 0.25),
+    ("background", 10 ** 9, main.REASON_DEADLINES["background"]),
+])
+def test_deadline_clamped_to_budget(client, monkeypatch, priority, deadline_ms, expected):
+    seen = []
+    slot = main.SCHEDULER.slot
+
+    def record(p, timeout):
+        seen.append(timeout)
+        return slot(p, timeout)
+
+    monkeypatch.setattr(main.SCHEDULER, "slot", record)
+    extra = {"priority": priority}
+    if deadline_ms is not None:
+        extra["deadline_ms"] = deadline_ms
+    assert _ask(client, **extra).status_code == 200
+    assert seen == [pytest.approx(expected)]
+
+
+def test_shed_answers_from_rules_engine(client, monkeypatch):
+    def boom(*a):
+        raise AssertionError("model must not be called when shed")
+
+    monkeypatch.setattr(main, "generate_options", boom)
+    monkeypatch.setattr(main, "SCHEDULER", RequestScheduler(max_inflight=1, max_queue={"interactive": 0}))
+    main.SCHEDULER.admit("interactive", 1)  # occupy the only slot
+
+    r = _ask(client)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["engine"] == "rules" and body["shed"] is True
+    assert body["options"]
+    assert client.get("/status/scheduler").json()["queues"]["interactive"]["shed"] == 1
+
+
+def test_startup_fails_when_queues_exceed_threadpool(monkeypatch):
+    monkeypatch.setattr(main, "SCHEDULER", RequestScheduler(max_inflight=4, max_queue={"interactive": 40}))
+    with pytest.raises(RuntimeError, match="threadpool"):
+        with TestClient(main.app):
+            pass
@@ -0,0 +1,149 @@
+import threading, time
+
+import pytest
+
+from app.scheduler import RequestScheduler
+
+
+def _hold_slot(s, priority="interactive"):
+    """Admit one request and return the event that releases it."""
+    done = threading.Event()
+    admitted = threading.Event()
+
+    def run():
+        with s.slot(priority, 5) as ok:
+            assert ok
+            admitted.set()
+            done.wait(5)
+
+    threading.Thread(target=run, daemon=True).start()
+    assert admitted.wait(2)
+    return done
+
+
+def _wait_depth(s, priority, depth):
+    for _ in range(200):
+        if s.stats()["queues"][priority]["depth"] == depth:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{priority} queue never reached depth {depth}")
+
+
+def test_interactive_drains_before_background():
+    s = RequestScheduler(max_inflight=1)
+    release = _hold_slot(s, "background")
+    order = []
+
+    def run(priority, tag):
+        with s.slot(priority, 5) as ok:
+            order.append((tag, ok))
+
+    threads = []
+    for priority, tag in [("background", "b1"), ("background", "b2"), ("interactive", "i1")]:
+        t = threading.Thread(target=run, args=(priority, tag))
+        t.start()
+        threads.append(t)
+        _wait_depth(s, priority, 1 if tag != "b2" else 2)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert order == [("i1", True), ("b1", True), ("b2", True)]
+
+
+def test_shed_when_queue_full():
+    s = RequestScheduler(max_inflight=1, max_queue={"background": 1})
+    release = _hold_slot(s)
+    t = threading.Thread(target=s.admit, args=("background", 5))
+    t.start()
+    _wait_depth(s, "background", 1)
+
+    start = time.monotonic()
+    assert s.admit("background", 5) is None
+    assert time.monotonic() - start < 0.5
+    assert s.stats()["queues"]["background"]["shed"] == 1
+
+    release.set()
+    t.join(5)
+
+
+def test_shed_when_estimated_wait_exceeds_deadline():
+    s = RequestScheduler(max_inflight=1)
+    s.admit("interactive", 1)
+    s.release(1.0)  # model calls take ~1 s
+    release = _hold_slot(s)
+
+    start = time.monotonic()
+    assert s.admit("interactive", 0.1) is None
+    assert time.monotonic() - start < 0.05
+    assert s.stats()["queues"]["interactive"]["depth"] == 0
+    release.set()
+
+
+def test_shed_when_deadline_expires_in_queue():
+    s = RequestScheduler(max_inflight=1)
+    release = _hold_slot(s)
+
+    start = time.monotonic()
+    assert s.admit("interactive", 0.1) is None
+    assert time.monotonic() - start >= 0.1
+    stats = s.stats()["queues"]["interactive"]
+    assert stats["depth"] == 0 and stats["shed"] == 1
+    assert stats["shed_max_wait_s"] >= 0.1
+    release.set()
+
+
+def test_queued_request_gives_up_in_time_for_model_call():
+    s = RequestScheduler(max_inflight=1)
+    s.admit("interactive", 1)
+    s.release(0.1)  # model calls take ~0.1 s
+    release = _hold_slot(s)
+
+    start = time.monotonic()
+    assert s.admit("interactive", 0.3) is None
+    elapsed = time.monotonic() - start
+    assert 0.15 <= elapsed < 0.28
+    release.set()
+
+
+def test_free_slot_admits_without_queue_capacity():
+    s = RequestScheduler(max_inflight=2, max_queue={"background": 0})
+    assert s.admit("background", 5) is not None
+    assert s.admit("background", 5) is not None
+    # both slots busy: now the request would have to wait, and cannot
+    assert s.admit("background", 5) is None
+
+
+def test_queue_cleaned_up_after_error_while_waiting(monkeypatch):
+    s = RequestScheduler(max_inflight=1)
+    release = _hold_slot(s)
+
+    def boom(timeout=None):
+        raise OverflowError("timeout value is too large")
+
+    monkeypatch.setattr(s._cond, "wait", boom)
+    with pytest.raises(OverflowError):
+        s.admit("interactive", 5)
+    monkeypatch.undo()
+    assert s.stats()["queues"]["interactive"]["depth"] == 0
+
+    release.set()
+    assert s.admit("interactive", 1) is not None
+
+
+def test_infinite_timeout_does_not_overflow():
+    s = RequestScheduler(max_inflight=1)
+    release = _hold_slot(s)
+    result = []
+    t = threading.Thread(target=lambda: result.append(s.admit("interactive", float("inf"))))
+    t.start()
+    _wait_depth(s, "interactive", 1)
+    release.set()
+    t.join(5)
+    assert result and result[0] is not None
+
+
+def test_unknown_priority_rejected():
+    s = RequestScheduler()
+    with pytest.raises(ValueError):
+        s.admit("urgent", 1)